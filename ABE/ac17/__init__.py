@@ -27,6 +27,19 @@ class AC17CPABE(ABEnc):
         self.group = group_obj
         self.assump_size = assump_size  # size of linear assumption, at least 2
         self.util = MSP(self.group, verbose)
+        self._h_cache = {}  # hash-to-G1 results, they only depend on the input string
+        self._prune_cache = {}  # (policy, attr_list) -> attributes used for decryption
+
+    def _hash(self, input_for_hash):
+        """
+        Hash a string to G1, re-using earlier results for the same string.
+        """
+
+        hashed_value = self._h_cache.get(input_for_hash)
+        if hashed_value is None:
+            hashed_value = self.group.hash(input_for_hash, G1)
+            self._h_cache[input_for_hash] = hashed_value
+        return hashed_value
 
     def setup(self):
         """
@@ -70,14 +83,30 @@ class AC17CPABE(ABEnc):
         for i in range(self.assump_size):
             e_gh_kA.append(e_gh ** (k[i] * A[i] + k[self.assump_size]))
 
-        # the public key
+        # the public key; the pairings e(g, h)^(k_i a_i + k_{k+1}) are computed here
+        # once, so encryption never has to evaluate a pairing
         pk = {'h_A': h_A, 'e_gh_kA': e_gh_kA}
 
         # the master secret key
         msk = {'g': g, 'h': h, 'g_k': g_k, 'A': A, 'B': B}
 
+        self.precompute(pk, msk)
+
         return pk, msk
 
+    def precompute(self, pk, msk=None):
+        """
+        Build fixed-base exponentiation tables for the key elements that are raised to fresh exponents.
+        """
+
+        for h_A_i in pk['h_A']:
+            h_A_i.initPP()
+        for e_gh_kA_i in pk['e_gh_kA']:
+            e_gh_kA_i.initPP()
+        if msk is not None:
+            msk['g'].initPP()
+            msk['h'].initPP()
+
     def keygen(self, pk, msk, attr_list):
         """
         Generate a key for a list of attributes.
@@ -107,20 +136,29 @@ class AC17CPABE(ABEnc):
         for i in range(self.assump_size + 1):
             K_0.append(msk['h'] ** Br[i])
 
+        # the exponents Br[l]/a_t are the same for every attribute, so invert A
+        # once and compute the whole exponent table up front
+        A = msk['A']
+        A_inv = []
+        Br_over_A = []
+        for t in range(self.assump_size):
+            a_t_inv = 1 / A[t]
+            A_inv.append(a_t_inv)
+            Br_over_A.append([Br[l] * a_t_inv for l in range(self.assump_size + 1)])
+
         # compute [W_1 Br]_1, ...
         K = {}
-        A = msk['A']
         g = msk['g']
         for attr in attr_list:
             key = []
             sigma_attr = self.group.random(ZR)
             for t in range(self.assump_size):
                 prod = 1
-                a_t = A[t]
+                exps = Br_over_A[t]
                 for l in range(self.assump_size + 1):
                     input_for_hash = attr + str(l) + str(t)
-                    prod *= (self.group.hash(input_for_hash, G1) ** (Br[l]/a_t))
-                prod *= (g ** (sigma_attr/a_t))
+                    prod *= (self._hash(input_for_hash) ** exps[l])
+                prod *= (g ** (sigma_attr * A_inv[t]))
                 key.append(prod)
             key.append(g ** (-sigma_attr))
             K[attr] = key
@@ -131,45 +169,25 @@ class AC17CPABE(ABEnc):
         sigma = self.group.random(ZR)
         for t in range(self.assump_size):
             prod = g_k[t]
-            a_t = A[t]
+            exps = Br_over_A[t]
             for l in range(self.assump_size + 1):
                 input_for_hash = '01' + str(l) + str(t)
-                prod *= (self.group.hash(input_for_hash, G1) ** (Br[l] / a_t))
-            prod *= (g ** (sigma / a_t))
+                prod *= (self._hash(input_for_hash) ** exps[l])
+            prod *= (g ** (sigma * A_inv[t]))
             Kp.append(prod)
         Kp.append(g_k[self.assump_size] * (g ** (-sigma)))
 
         return {'attr_list': attr_list, 'K_0': K_0, 'K': K, 'Kp': Kp}
 
-    def encrypt(self, pk, msg, policy_str):
+    def prepare_policy(self, policy_str):
         """
-        Encrypt a message msg under a policy string.
+        Parse a policy string and precompute the parts of encryption that only depend on the policy.
         """
 
-        if debug:
-            print('\nEncryption algorithm:\n')
-
         policy = self.util.createPolicy(policy_str)
         mono_span_prog = self.util.convert_policy_to_msp(policy)
         num_cols = self.util.len_longest_row
 
-        # pick randomness
-        s = []
-        sum = 0
-        for i in range(self.assump_size):
-            rand = self.group.random(ZR)
-            s.append(rand)
-            sum += rand
-
-        # compute the [As]_2 term
-        C_0 = []
-        h_A = pk['h_A']
-        for i in range(self.assump_size):
-            C_0.append(h_A[i] ** s[i])
-        C_0.append(h_A[self.assump_size] ** sum)
-
-        # compute the [(V^T As||U^T_2 As||...) M^T_i + W^T_i As]_1 terms
-
         # pre-compute hashes
         hash_table = []
         for j in range(num_cols):
@@ -180,26 +198,72 @@ class AC17CPABE(ABEnc):
                 input_for_hash2 = input_for_hash1 + str(l)
                 for t in range(self.assump_size):
                     input_for_hash3 = input_for_hash2 + str(t)
-                    hashed_value = self.group.hash(input_for_hash3, G1)
+                    hashed_value = self._hash(input_for_hash3)
                     y.append(hashed_value)
                     # if debug: print ('Hash of', i+2, ',', j2, ',', j1, 'is', hashed_value)
                 x.append(y)
             hash_table.append(x)
 
-        C = {}
+        # combine the hashes of every row into one base per (l, t), so that
+        # encryption only has to raise these bases to its fresh randomness
+        bases = {}
         for attr, row in mono_span_prog.items():
-            ct = []
+            attr_bases = []
             attr_stripped = self.util.strip_index(attr)  # no need, re-use not allowed
+            cols = len(row)
             for l in range(self.assump_size + 1):
-                prod = 1
-                cols = len(row)
+                y = []
                 for t in range(self.assump_size):
                     input_for_hash = attr_stripped + str(l) + str(t)
-                    prod1 = self.group.hash(input_for_hash, G1)
+                    prod1 = self._hash(input_for_hash)
                     for j in range(cols):
                         # input_for_hash = '0' + str(j+1) + str(l) + str(t)
                         prod1 *= (hash_table[j][l][t] ** row[j])
-                    prod *= (prod1 ** s[t])
+                    prod1.initPP()  # raised to fresh randomness in every encryption
+                    y.append(prod1)
+                attr_bases.append(y)
+            bases[attr] = attr_bases
+
+        return {'policy': policy, 'bases': bases}
+
+    def encrypt(self, pk, msg, policy_str):
+        """
+        Encrypt a message msg under a policy string.
+        """
+
+        return self.encrypt_prepared(pk, msg, self.prepare_policy(policy_str))
+
+    def encrypt_prepared(self, pk, msg, prepared):
+        """
+        Encrypt a message msg under a policy returned by prepare_policy.
+        """
+
+        if debug:
+            print('\nEncryption algorithm:\n')
+
+        # pick randomness
+        s = []
+        sum = 0
+        for i in range(self.assump_size):
+            rand = self.group.random(ZR)
+            s.append(rand)
+            sum += rand
+
+        # compute the [As]_2 term
+        C_0 = []
+        h_A = pk['h_A']
+        for i in range(self.assump_size):
+            C_0.append(h_A[i] ** s[i])
+        C_0.append(h_A[self.assump_size] ** sum)
+
+        # compute the [(V^T As||U^T_2 As||...) M^T_i + W^T_i As]_1 terms
+        C = {}
+        for attr, attr_bases in prepared['bases'].items():
+            ct = []
+            for l in range(self.assump_size + 1):
+                prod = 1
+                for t in range(self.assump_size):
+                    prod *= (attr_bases[l][t] ** s[t])
                 ct.append(prod)
             C[attr] = ct
 
@@ -209,7 +273,7 @@ class AC17CPABE(ABEnc):
             Cp = Cp * (pk['e_gh_kA'][i] ** s[i])
         Cp = Cp * msg
 
-        return {'policy': policy, 'C_0': C_0, 'C': C, 'Cp': Cp}
+        return {'policy': prepared['policy'], 'C_0': C_0, 'C': C, 'Cp': Cp}
 
     def decrypt(self, pk, ctxt, key):
         """
@@ -219,24 +283,37 @@ class AC17CPABE(ABEnc):
         if debug:
             print('\nDecryption algorithm:\n')
 
-        nodes = self.util.prune(ctxt['policy'], key['attr_list'])
-        if not nodes:
+        # which attributes to combine only depends on the policy and the attribute
+        # list, not on the ciphertext, so the pruning result is cached
+        cache_key = (str(ctxt['policy']), tuple(key['attr_list']))
+        attrs = self._prune_cache.get(cache_key)
+        if attrs is None:
+            nodes = self.util.prune(ctxt['policy'], key['attr_list'])
+            attrs = []
+            if nodes:
+                for node in nodes:
+                    attr = node.getAttributeAndIndex()
+                    attrs.append((attr, self.util.strip_index(attr)))  # no need, re-use not allowed
+            self._prune_cache[cache_key] = attrs
+        if not attrs:
             print ("Policy not satisfied.")
             return None
 
-        prod1_GT = 1
-        prod2_GT = 1
+        # e(prod_G, K_0) / e(Kp * prod_H, C_0) is evaluated as a single product of
+        # pairings, so that all Miller loops share one final exponentiation
+        lhs = []
+        rhs = []
         for i in range(self.assump_size + 1):
             prod_H = 1
             prod_G = 1
-            for node in nodes:
-                attr = node.getAttributeAndIndex()
-                attr_stripped = self.util.strip_index(attr)  # no need, re-use not allowed
+            for attr, attr_stripped in attrs:
                 # prod_H *= key['K'][attr_stripped][i] ** coeff[attr]
                 # prod_G *= ctxt['C'][attr][i] ** coeff[attr]
                 prod_H *= key['K'][attr_stripped][i]
                 prod_G *= ctxt['C'][attr][i]
-            prod1_GT *= pair(key['Kp'][i] * prod_H, ctxt['C_0'][i])
-            prod2_GT *= pair(prod_G, key['K_0'][i])
+            lhs.append(prod_G)
+            rhs.append(key['K_0'][i])
+            lhs.append((key['Kp'][i] * prod_H) ** -1)
+            rhs.append(ctxt['C_0'][i])
 
-        return ctxt['Cp'] * prod2_GT / prod1_GT
+        return ctxt['Cp'] * self.group.pair_prod(lhs, rhs)
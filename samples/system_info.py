@@ -8,88 +8,234 @@ Date: Generated for ABE Performance Study
 import platform
 import psutil
 import subprocess
+import shutil
 import sys
 import os
 import csv
+import json
+import argparse
+import itertools
+import concurrent.futures
+import threading
+import plistlib
+import re
 from datetime import datetime
+from xml.parsers.expat import ExpatError
+try:
+    import importlib.metadata as importlib_metadata
+except ImportError:  # Python < 3.8
+    importlib_metadata = None
+
+# The platform is fixed for the lifetime of the process, so the platform
+# specific collector variants are picked once, when the class is defined
+_SYSTEM = platform.system()
+
+# "model name" line of /proc/cpuinfo (Linux)
+_CPU_RE = re.compile(rb'^model name[ \t]*:[ \t]*(.+)$', re.M)
+
+# MemTotal / MemAvailable lines of /proc/meminfo (Linux), values in kB
+_MEMINFO_RE = re.compile(rb'^(MemTotal|MemAvailable):\s*(\d+) kB', re.M)
+
+# Characters that have to be escaped in LaTeX table cells
+_LATEX_ESCAPE = str.maketrans({'&': r'\&', '_': r'\_', '%': r'\%', '#': r'\#', '$': r'\$'})
+
+
+def _normalize_package_name(name):
+    """Normalize a distribution name so that e.g. Charm_Crypto matches charm-crypto"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def _run(cmd, timeout=5, text=True, stderr=subprocess.PIPE):
+    """Run a command and return its output, or None if it fails or times out"""
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=stderr, text=text, timeout=timeout)
+    except (subprocess.SubprocessError, OSError, ValueError):
+        # OSError covers missing, non-executable and wrong-architecture binaries,
+        # ValueError covers output that is not valid text
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def _parse_ganache_version(output):
+    """Ganache prints its version on the first line"""
+    return output.strip().split('\n')[0]
+
+
+def _parse_truffle_version(output):
+    """Extract the Truffle version from the output of 'truffle version'"""
+    for line in output.split('\n'):
+        if 'Truffle' in line:
+            return line.split(':')[1].strip() if ':' in line else line.strip()
+    return "Not found"
+
+
+def _parse_ipfs_version(output):
+    """IPFS prints a single version line"""
+    return output.strip()
+
+
+def _parse_geth_version(output):
+    """Extract the version from the output of 'geth version'"""
+    for line in output.split('\n'):
+        if 'Version:' in line:
+            return line.split(':')[1].strip()
+    return "Not found"
+
 
 class SystemInfoCollector:
-    def __init__(self):
-        self.system_info = {}
-        self.collect_all_info()
+    # key in system_info -> name of the collector method
+    COLLECTORS = (
+        ('cpu', 'get_cpu_info'),
+        ('memory', 'get_memory_info'),
+        ('os', 'get_os_info'),
+        ('storage', 'get_storage_info'),
+        ('packages', 'get_python_packages'),
+        ('blockchain_tools', 'get_blockchain_tools'),
+        ('gpu', 'get_gpu_info'),
+        ('network', 'get_network_info')
+    )
+    
+    def __init__(self, output_dir=None):
+        # CSV and LaTeX files go next to this script unless told otherwise
+        self.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+        # collected lazily, on first use by one of the output methods
+        self.system_info = None
+        # constant for the lifetime of the process, look them up only once
+        self._cpu_physical = psutil.cpu_count(logical=False)
+        self._cpu_logical = psutil.cpu_count(logical=True)
+        self._freq = psutil.cpu_freq()
+        self._sp_cache = None
+        self._sp_lock = threading.Lock()
+    
+    def _ensure_collected(self):
+        """Collect whatever system information has not been collected yet"""
+        if self.system_info is None:
+            self.collect_all_info()
+            return
+        missing = tuple(key for key, _ in self.COLLECTORS if key not in self.system_info)
+        if missing:
+            self.collect_all_info(which=missing)
+    
+    def _get_system_profiler(self, data_type):
+        """Get the system_profiler items of one data type, running it once for all of them (macOS)
+
+        Returns None if system_profiler failed or did not report the data type.
+        """
+        # memory, storage and GPU collectors may ask concurrently
+        with self._sp_lock:
+            if self._sp_cache is None:
+                self._sp_cache = {}
+                # system_profiler can take a few seconds, but must not hang the collection
+                result = _run(
+                    ["system_profiler", "-xml", "SPMemoryDataType", "SPStorageDataType", "SPDisplaysDataType"],
+                    timeout=15, text=False
+                )
+                if result is not None:
+                    try:
+                        self._sp_cache = {
+                            section['_dataType']: section.get('_items', [])
+                            for section in plistlib.loads(result)
+                        }
+                    except (plistlib.InvalidFileException, ExpatError, ValueError,
+                            KeyError, TypeError, AttributeError):
+                        pass
+            return self._sp_cache.get(data_type)
+    
+    def _get_cpu_brand_darwin(self):
+        """Get CPU brand/model on macOS"""
+        result = _run(["sysctl", "-n", "machdep.cpu.brand_string"])
+        return result.strip() if result is not None else "Unknown"
+    
+    def _get_cpu_brand_linux(self):
+        """Get CPU brand/model on Linux"""
+        # the first processor's block is enough
+        with open("/proc/cpuinfo", "rb") as f:
+            data = f.read(4096)
+        m = _CPU_RE.search(data)
+        return m.group(1).decode().strip() if m else "Unknown"
+    
+    def _get_cpu_brand_other(self):
+        """Get CPU brand/model on Windows and other systems"""
+        return platform.processor()
+    
+    if _SYSTEM == "Darwin":
+        _get_cpu_brand = _get_cpu_brand_darwin
+    elif _SYSTEM == "Linux":
+        _get_cpu_brand = _get_cpu_brand_linux
+    else:
+        _get_cpu_brand = _get_cpu_brand_other
     
     def get_cpu_info(self):
         """Collect CPU information"""
         try:
-            # Get CPU brand/model
-            if platform.system() == "Darwin":  # macOS
-                cpu_brand = subprocess.check_output(
-                    ["sysctl", "-n", "machdep.cpu.brand_string"]
-                ).decode().strip()
-            elif platform.system() == "Linux":
-                with open("/proc/cpuinfo", "r") as f:
-                    for line in f:
-                        if "model name" in line:
-                            cpu_brand = line.split(":")[1].strip()
-                            break
-                    else:
-                        cpu_brand = "Unknown"
-            else:  # Windows
-                cpu_brand = platform.processor()
+            cpu_brand = self._get_cpu_brand()
             
             return {
                 'brand': cpu_brand,
                 'architecture': platform.machine(),
-                'cores_physical': psutil.cpu_count(logical=False),
-                'cores_logical': psutil.cpu_count(logical=True),
-                'frequency_ghz': round(psutil.cpu_freq().max / 1000, 2) if psutil.cpu_freq() else "Unknown"
+                'cores_physical': self._cpu_physical,
+                'cores_logical': self._cpu_logical,
+                'frequency_ghz': round(self._freq.max / 1000, 2) if self._freq else "Unknown"
             }
         except Exception as e:
             return {
                 'brand': f"Error collecting CPU info: {str(e)}",
                 'architecture': platform.machine(),
-                'cores_physical': psutil.cpu_count(logical=False),
-                'cores_logical': psutil.cpu_count(logical=True),
+                'cores_physical': self._cpu_physical,
+                'cores_logical': self._cpu_logical,
                 'frequency_ghz': "Unknown"
             }
     
     def get_memory_info(self):
         """Collect memory information"""
-        memory = psutil.virtual_memory()
+        meminfo = {}
+        if _SYSTEM == "Linux":
+            with open("/proc/meminfo", "rb") as f:
+                meminfo = {name: int(kb) * 1024 for name, kb in _MEMINFO_RE.findall(f.read())}
+        if len(meminfo) == 2:
+            total = meminfo[b'MemTotal']
+            available = meminfo[b'MemAvailable']
+        else:  # not Linux, or a kernel without MemAvailable
+            memory = psutil.virtual_memory()
+            total = memory.total
+            available = memory.available
         return {
-            'total_gb': round(memory.total / (1024**3), 2),
-            'available_gb': round(memory.available / (1024**3), 2),
+            'total_gb': round(total / (1024**3), 2),
+            'available_gb': round(available / (1024**3), 2),
             'type': self.get_memory_type()
         }
     
-    def get_memory_type(self):
-        """Try to determine memory type"""
-        try:
-            if platform.system() == "Darwin":  # macOS
-                result = subprocess.check_output(
-                    ["system_profiler", "SPMemoryDataType"]
-                ).decode()
-                if "DDR4" in result:
-                    return "DDR4"
-                elif "DDR5" in result:
-                    return "DDR5"
-                elif "DDR3" in result:
-                    return "DDR3"
-                else:
-                    return "Unknown DDR"
-            else:
-                return "Unknown"
-        except:
+    def _get_memory_type_darwin(self):
+        """Try to determine memory type (macOS)"""
+        items = self._get_system_profiler("SPMemoryDataType")
+        if items is None:
             return "Unknown"
+        # Apple Silicon reports dimm_type on the item itself,
+        # Intel Macs on the individual memory slots below it
+        dimm_types = []
+        for item in items:
+            dimm_types.append(item.get('dimm_type', ''))
+            dimm_types.extend(slot.get('dimm_type', '') for slot in item.get('_items', []))
+        for ddr in ("DDR4", "DDR5", "DDR3"):
+            if any(ddr in dimm_type for dimm_type in dimm_types):
+                return ddr
+        return "Unknown DDR"
+    
+    def _get_memory_type_unknown(self):
+        """Memory type is only detected on macOS"""
+        return "Unknown"
+    
+    get_memory_type = _get_memory_type_darwin if _SYSTEM == "Darwin" else _get_memory_type_unknown
     
     def get_os_info(self):
         """Collect operating system information"""
+        uname = platform.uname()  # system, release and version in one call
         return {
-            'name': platform.system(),
-            'version': platform.version(),
-            'release': platform.release(),
+            'name': uname.system,
+            'version': uname.version,
+            'release': uname.release,
             'platform': platform.platform(),
-            'python_version': platform.python_version()
+            'python_version': sys.version.split()[0]
         }
     
     def get_python_packages(self):
@@ -116,28 +262,42 @@ class SystemInfoCollector:
             'brownie-eth'
         ]
         
+        if importlib_metadata is not None:
+            # One pass over the installed distributions, no pip subprocess needed
+            installed = {}
+            for dist in importlib_metadata.distributions():
+                name = dist.metadata['Name']
+                if name:
+                    installed.setdefault(_normalize_package_name(name), dist.version)
+        else:
+            # Fallback: a single pip invocation for all packages
+            installed = {}
+            result = _run([sys.executable, '-m', 'pip', 'list', '--format=json'], timeout=60)
+            if result is not None:
+                try:
+                    installed = {_normalize_package_name(p['name']): p['version'] for p in json.loads(result)}
+                except (ValueError, KeyError):
+                    pass
+        
         for package in key_packages:
-            try:
-                result = subprocess.check_output([sys.executable, '-m', 'pip', 'show', package])
-                lines = result.decode().split('\n')
-                for line in lines:
-                    if line.startswith('Version:'):
-                        packages[package] = line.split(':')[1].strip()
-                        break
-                else:
-                    packages[package] = "Not found"
-            except:
-                packages[package] = "Not installed"
+            packages[package] = installed.get(_normalize_package_name(package), "Not installed")
         
         return packages
 
     def get_storage_info(self):
         """Get storage information"""
         try:
-            disk_usage = psutil.disk_usage('/')
+            if hasattr(os, 'statvfs'):  # POSIX
+                st = os.statvfs('/')
+                total = st.f_blocks * st.f_frsize
+                free = st.f_bavail * st.f_frsize
+            else:
+                disk_usage = psutil.disk_usage('/')
+                total = disk_usage.total
+                free = disk_usage.free
             return {
-                'total_gb': round(disk_usage.total / (1024**3), 2),
-                'free_gb': round(disk_usage.free / (1024**3), 2),
+                'total_gb': round(total / (1024**3), 2),
+                'free_gb': round(free / (1024**3), 2),
                 'type': self.get_storage_type()
             }
         except:
@@ -147,87 +307,62 @@ class SystemInfoCollector:
                 'type': "Unknown"
             }
     
-    def get_storage_type(self):
-        """Try to determine storage type (SSD/HDD)"""
-        try:
-            if platform.system() == "Darwin":  # macOS
-                result = subprocess.check_output(
-                    ["system_profiler", "SPStorageDataType"]
-                ).decode()
-                if "Solid State" in result or "SSD" in result:
-                    return "SSD"
-                else:
-                    return "HDD/Unknown"
-            else:
-                return "Unknown"
-        except:
+    def _get_storage_type_darwin(self):
+        """Try to determine storage type (SSD/HDD) on macOS"""
+        volumes = self._get_system_profiler("SPStorageDataType")
+        if volumes is None:
             return "Unknown"
+        for volume in volumes:
+            if volume.get('physical_drive', {}).get('medium_type', '').lower() == 'ssd':
+                return "SSD"
+        return "HDD/Unknown"
+    
+    def _get_storage_type_unknown(self):
+        """Storage type is only detected on macOS"""
+        return "Unknown"
+    
+    get_storage_type = _get_storage_type_darwin if _SYSTEM == "Darwin" else _get_storage_type_unknown
+
+    def _check_tool(self, key, command, parse):
+        """Run a tool's version command and parse its output, returns (key, version)"""
+        path = shutil.which(command[0])
+        if not path:
+            return key, "Not installed"
+        result = _run([path] + command[1:], stderr=subprocess.STDOUT)
+        if result is None:
+            return key, "Not installed"
+        return key, parse(result)
 
     def get_blockchain_tools(self):
         """Get blockchain and IPFS tool versions"""
-        tools = {}
-        
-        # Check for Ganache CLI
-        try:
-            result = subprocess.check_output(['ganache-cli', '--version'], stderr=subprocess.STDOUT)
-            tools['Ganache CLI'] = result.decode().strip().split('\n')[0]
-        except:
-            tools['Ganache CLI'] = "Not installed"
-        
-        # Check for Truffle
-        try:
-            result = subprocess.check_output(['truffle', 'version'], stderr=subprocess.STDOUT)
-            lines = result.decode().split('\n')
-            for line in lines:
-                if 'Truffle' in line:
-                    tools['Truffle'] = line.split(':')[1].strip() if ':' in line else line.strip()
-                    break
-            else:
-                tools['Truffle'] = "Not found"
-        except:
-            tools['Truffle'] = "Not installed"
-        
-        # Check for IPFS
-        try:
-            result = subprocess.check_output(['ipfs', 'version'], stderr=subprocess.STDOUT)
-            tools['IPFS'] = result.decode().strip()
-        except:
-            tools['IPFS'] = "Not installed"
-        
-        # Check for Go Ethereum (geth)
-        try:
-            result = subprocess.check_output(['geth', 'version'], stderr=subprocess.STDOUT)
-            lines = result.decode().split('\n')
-            for line in lines:
-                if 'Version:' in line:
-                    tools['Go Ethereum (geth)'] = line.split(':')[1].strip()
-                    break
-            else:
-                tools['Go Ethereum (geth)'] = "Not found"
-        except:
-            tools['Go Ethereum (geth)'] = "Not installed"
+        checks = [
+            ('Ganache CLI', ['ganache-cli', '--version'], _parse_ganache_version),
+            ('Truffle', ['truffle', 'version'], _parse_truffle_version),
+            ('IPFS', ['ipfs', 'version'], _parse_ipfs_version),
+            ('Go Ethereum (geth)', ['geth', 'version'], _parse_geth_version)
+        ]
         
-        return tools
+        # The tool startups dominate and are independent, so run them in parallel
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            futures = [executor.submit(self._check_tool, *check) for check in checks]
+            return dict(future.result() for future in futures)
 
-    def get_gpu_info(self):
-        """Get GPU information if available"""
-        try:
-            if platform.system() == "Darwin":  # macOS
-                result = subprocess.check_output(
-                    ["system_profiler", "SPDisplaysDataType"]
-                ).decode()
-                # Extract GPU info
-                lines = result.split('\n')
-                gpu_info = "Unknown"
-                for line in lines:
-                    if "Chipset Model:" in line:
-                        gpu_info = line.split(':')[1].strip()
-                        break
-                return gpu_info
-            else:
-                return "Unknown"
-        except:
+    def _get_gpu_info_darwin(self):
+        """Get GPU information if available (macOS)"""
+        gpus = self._get_system_profiler("SPDisplaysDataType")
+        if gpus is None:
             return "Not detected"
+        # Extract GPU info
+        for gpu in gpus:
+            if 'sppci_model' in gpu:
+                return gpu['sppci_model']
+        return "Unknown"
+    
+    def _get_gpu_info_unknown(self):
+        """GPU information is only detected on macOS"""
+        return "Unknown"
+    
+    get_gpu_info = _get_gpu_info_darwin if _SYSTEM == "Darwin" else _get_gpu_info_unknown
 
     def get_network_info(self):
         """Get network interface information"""
@@ -244,164 +379,120 @@ class SystemInfoCollector:
         except:
             return "Unknown"
 
-    def collect_all_info(self):
-        """Collect all system information"""
+    def collect_all_info(self, which=None):
+        """Collect all system information, or only the keys listed in which"""
+        if isinstance(which, str):
+            which = (which,)
+        if which is not None:
+            unknown = set(which) - {key for key, _ in self.COLLECTORS}
+            if unknown:
+                raise ValueError(f"Unknown collector(s): {', '.join(sorted(unknown))}")
+        
         print("Collecting system information...")
         
-        self.system_info = {
-            'collection_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'cpu': self.get_cpu_info(),
-            'memory': self.get_memory_info(),
-            'os': self.get_os_info(),
-            'storage': self.get_storage_info(),
-            'packages': self.get_python_packages(),
-            'blockchain_tools': self.get_blockchain_tools(),
-            'gpu': self.get_gpu_info(),
-            'network': self.get_network_info()
-        }
-
-    def generate_academic_table(self):
-        """Generate academic-style configuration table"""
-        print("\n" + "="*80)
-        print("HARDWARE AND SOFTWARE CONFIGURATION TABLE")
-        print("="*80)
+        collectors = [
+            (key, getattr(self, method)) for key, method in self.COLLECTORS
+            if which is None or key in which
+        ]
+        
+        if self.system_info is None:
+            self.system_info = {}
+        if not collectors:
+            return
         
-        # Hardware Configuration
-        print("\nHARDWARE CONFIGURATION:")
-        print("-"*50)
+        # The collectors are independent and mostly wait on subprocesses,
+        # so run them in threads to overlap the waits
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(collectors)) as executor:
+            futures = {key: executor.submit(collector) for key, collector in collectors}
+            collected = {key: future.result() for key, future in futures.items()}
         
+        self.system_info.update(collected)
+        self.system_info['collection_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _iter_rows(self):
+        """Yield (section, component, specification) for every configuration row"""
         cpu = self.system_info['cpu']
         memory = self.system_info['memory']
         storage = self.system_info['storage']
         
-        hardware_table = [
-            ["Component", "Specification"],
-            ["-"*20, "-"*40],
-            ["Processor (CPU)", f"{cpu['brand']}"],
-            ["Architecture", f"{cpu['architecture']}"],
-            ["Physical Cores", f"{cpu['cores_physical']} cores"],
-            ["Logical Cores", f"{cpu['cores_logical']} cores"],
-            ["CPU Frequency", f"{cpu['frequency_ghz']} GHz" if cpu['frequency_ghz'] != "Unknown" else "Unknown"],
-            ["Graphics (GPU)", f"{self.system_info['gpu']}"],
-            ["Total RAM", f"{memory['total_gb']} GB"],
-            ["Available RAM", f"{memory['available_gb']} GB"],
-            ["Memory Type", f"{memory['type']}"],
-            ["Storage Total", f"{storage['total_gb']} GB"],
-            ["Storage Available", f"{storage['free_gb']} GB"],
-            ["Storage Type", f"{storage['type']}"],
-            ["Network Interfaces", f"{self.system_info['network']}"]
-        ]
-        
-        for row in hardware_table:
-            print(f"{row[0]:<20} | {row[1]}")
-        
-        # Software Configuration
-        print("\nSOFTWARE CONFIGURATION:")
-        print("-"*50)
+        yield ("Hardware", "Processor (CPU)", cpu['brand'])
+        yield ("Hardware", "Architecture", cpu['architecture'])
+        yield ("Hardware", "Physical Cores", f"{cpu['cores_physical']} cores")
+        yield ("Hardware", "Logical Cores", f"{cpu['cores_logical']} cores")
+        yield ("Hardware", "CPU Frequency", f"{cpu['frequency_ghz']} GHz" if cpu['frequency_ghz'] != "Unknown" else "Unknown")
+        yield ("Hardware", "Graphics (GPU)", self.system_info['gpu'])
+        yield ("Hardware", "Total RAM", f"{memory['total_gb']} GB")
+        yield ("Hardware", "Available RAM", f"{memory['available_gb']} GB")
+        yield ("Hardware", "Memory Type", memory['type'])
+        yield ("Hardware", "Storage Total", f"{storage['total_gb']} GB")
+        yield ("Hardware", "Storage Available", f"{storage['free_gb']} GB")
+        yield ("Hardware", "Storage Type", storage['type'])
+        yield ("Hardware", "Network Interfaces", self.system_info['network'])
         
         os_info = self.system_info['os']
         packages = self.system_info['packages']
         
-        software_table = [
-            ["Component", "Version/Details"],
-            ["-"*20, "-"*40],
-            ["Operating System", f"{os_info['name']} {os_info['release']}"],
-            ["OS Platform", f"{os_info['platform']}"],
-            ["Python Version", f"{os_info['python_version']}"],
-            ["Charm-Crypto", f"{packages.get('charm-crypto', 'Not installed')}"],
-            ["Psutil", f"{packages.get('psutil', 'Not installed')}"],
-            ["Cryptography", f"{packages.get('cryptography', 'Not installed')}"],
-            ["PyCryptodome", f"{packages.get('pycryptodome', 'Not installed')}"],
-            ["Web3.py", f"{packages.get('web3', 'Not installed')}"],
-            ["IPFS HTTP Client", f"{packages.get('ipfshttpclient', 'Not installed')}"],
-            ["NumPy", f"{packages.get('numpy', 'Not installed')}"],
-            ["Pandas", f"{packages.get('pandas', 'Not installed')}"]
-        ]
-        
-        for row in software_table:
-            print(f"{row[0]:<20} | {row[1]}")
-
-        # Blockchain/IPFS Tools
-        print("\nBLOCKCHAIN & IPFS TOOLS:")
-        print("-"*50)
+        yield ("Software", "Operating System", f"{os_info['name']} {os_info['release']}")
+        yield ("Software", "OS Platform", os_info['platform'])
+        yield ("Software", "Python Version", os_info['python_version'])
+        yield ("Software", "Charm-Crypto", packages.get('charm-crypto', 'Not installed'))
+        yield ("Software", "Psutil", packages.get('psutil', 'Not installed'))
+        yield ("Software", "Cryptography", packages.get('cryptography', 'Not installed'))
+        yield ("Software", "PyCryptodome", packages.get('pycryptodome', 'Not installed'))
+        yield ("Software", "Web3.py", packages.get('web3', 'Not installed'))
+        yield ("Software", "IPFS HTTP Client", packages.get('ipfshttpclient', 'Not installed'))
+        yield ("Software", "NumPy", packages.get('numpy', 'Not installed'))
+        yield ("Software", "Pandas", packages.get('pandas', 'Not installed'))
         
         blockchain_tools = self.system_info['blockchain_tools']
         
-        blockchain_table = [
-            ["Tool", "Version"],
-            ["-"*20, "-"*40],
-            ["IPFS", f"{blockchain_tools.get('IPFS', 'Not installed')}"],
-            ["Ganache CLI", f"{blockchain_tools.get('Ganache CLI', 'Not installed')}"],
-            ["Truffle", f"{blockchain_tools.get('Truffle', 'Not installed')}"],
-            ["Go Ethereum", f"{blockchain_tools.get('Go Ethereum (geth)', 'Not installed')}"]
-        ]
-        
-        for row in blockchain_table:
-            print(f"{row[0]:<20} | {row[1]}")
+        yield ("Blockchain/IPFS", "IPFS", blockchain_tools.get('IPFS', 'Not installed'))
+        yield ("Blockchain/IPFS", "Ganache CLI", blockchain_tools.get('Ganache CLI', 'Not installed'))
+        yield ("Blockchain/IPFS", "Truffle", blockchain_tools.get('Truffle', 'Not installed'))
+        yield ("Blockchain/IPFS", "Go Ethereum", blockchain_tools.get('Go Ethereum (geth)', 'Not installed'))
+
+    def generate_academic_table(self):
+        """Generate academic-style configuration table"""
+        self._ensure_collected()
+        # Build the whole table and write it to stdout in one go
+        lines = []
+        lines.append("\n" + "="*80)
+        lines.append("HARDWARE AND SOFTWARE CONFIGURATION TABLE")
+        lines.append("="*80)
+        
+        # section -> (title, column headers)
+        sections = {
+            "Hardware": ("HARDWARE CONFIGURATION", "Component", "Specification"),
+            "Software": ("SOFTWARE CONFIGURATION", "Component", "Version/Details"),
+            "Blockchain/IPFS": ("BLOCKCHAIN & IPFS TOOLS", "Tool", "Version")
+        }
         
-        print(f"\nCollection Time: {self.system_info['collection_time']}")
-        print("="*80)
+        for section, rows in itertools.groupby(self._iter_rows(), key=lambda row: row[0]):
+            title, component_header, specification_header = sections[section]
+            lines.append(f"\n{title}:")
+            lines.append("-"*50)
+            lines.append(f"{component_header:<20} | {specification_header}")
+            lines.append(f"{'-'*20:<20} | {'-'*40}")
+            lines.extend(f"{component:<20} | {specification}" for _, component, specification in rows)
+        
+        lines.append(f"\nCollection Time: {self.system_info['collection_time']}")
+        lines.append("="*80)
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def export_to_csv(self, filename="system_configuration.csv"):
         """Export configuration to CSV format"""
-        csv_path = f"/Users/thanhtuan/son/ABE/samples/{filename}"
+        self._ensure_collected()
+        csv_path = os.path.join(self.output_dir, filename)
         
         try:
-            with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+            with open(csv_path, 'w', newline='', encoding='utf-8', buffering=1024*1024) as csvfile:
                 writer = csv.writer(csvfile)
                 
                 # Write header
                 writer.writerow(["Configuration Type", "Component", "Specification"])
                 
-                # Hardware section
-                cpu = self.system_info['cpu']
-                memory = self.system_info['memory']
-                storage = self.system_info['storage']
-                
-                hardware_rows = [
-                    ["Hardware", "Processor (CPU)", cpu['brand']],
-                    ["Hardware", "Architecture", cpu['architecture']],
-                    ["Hardware", "Physical Cores", f"{cpu['cores_physical']} cores"],
-                    ["Hardware", "Logical Cores", f"{cpu['cores_logical']} cores"],
-                    ["Hardware", "CPU Frequency", f"{cpu['frequency_ghz']} GHz" if cpu['frequency_ghz'] != "Unknown" else "Unknown"],
-                    ["Hardware", "Graphics (GPU)", self.system_info['gpu']],
-                    ["Hardware", "Total RAM", f"{memory['total_gb']} GB"],
-                    ["Hardware", "Available RAM", f"{memory['available_gb']} GB"],
-                    ["Hardware", "Memory Type", memory['type']],
-                    ["Hardware", "Storage Total", f"{storage['total_gb']} GB"],
-                    ["Hardware", "Storage Available", f"{storage['free_gb']} GB"],
-                    ["Hardware", "Storage Type", storage['type']],
-                    ["Hardware", "Network Interfaces", self.system_info['network']]
-                ]
-                
-                # Software section
-                os_info = self.system_info['os']
-                packages = self.system_info['packages']
-                
-                software_rows = [
-                    ["Software", "Operating System", f"{os_info['name']} {os_info['release']}"],
-                    ["Software", "OS Platform", os_info['platform']],
-                    ["Software", "Python Version", os_info['python_version']],
-                    ["Software", "Charm-Crypto", packages.get('charm-crypto', 'Not installed')],
-                    ["Software", "Cryptography", packages.get('cryptography', 'Not installed')],
-                    ["Software", "PyCryptodome", packages.get('pycryptodome', 'Not installed')],
-                    ["Software", "Web3.py", packages.get('web3', 'Not installed')],
-                    ["Software", "IPFS HTTP Client", packages.get('ipfshttpclient', 'Not installed')],
-                    ["Software", "NumPy", packages.get('numpy', 'Not installed')],
-                    ["Software", "Pandas", packages.get('pandas', 'Not installed')]
-                ]
-
-                # Blockchain tools section
-                blockchain_tools = self.system_info['blockchain_tools']
-                blockchain_rows = [
-                    ["Blockchain/IPFS", "IPFS", blockchain_tools.get('IPFS', 'Not installed')],
-                    ["Blockchain/IPFS", "Ganache CLI", blockchain_tools.get('Ganache CLI', 'Not installed')],
-                    ["Blockchain/IPFS", "Truffle", blockchain_tools.get('Truffle', 'Not installed')],
-                    ["Blockchain/IPFS", "Go Ethereum", blockchain_tools.get('Go Ethereum (geth)', 'Not installed')]
-                ]
-                
-                # Write all rows
-                writer.writerows(hardware_rows + software_rows + blockchain_rows)
+                # Stream all rows straight from the shared row generator
+                writer.writerows(self._iter_rows())
                 
                 # Add metadata
                 writer.writerow([])
@@ -414,11 +505,9 @@ class SystemInfoCollector:
 
     def generate_latex_table(self):
         """Generate LaTeX table format for academic papers"""
-        print("\n" + "="*80)
-        print("LATEX TABLE FORMAT (for Section 6.1 - Academic Paper)")
-        print("="*80)
+        self._ensure_collected()
         
-        latex_code = """
+        parts = ["""
 % Hardware and Software Configuration Table for ABE Performance Study
 % Insert this in Section 6.1 (Page 25) as requested by Reviewer 1
 \\begin{table}[htbp]
@@ -431,7 +520,7 @@ class SystemInfoCollector:
 \\hline
 \\multicolumn{2}{|c|}{\\textbf{Hardware Configuration}} \\\\
 \\hline
-"""
+"""]
         
         # Add hardware info
         cpu = self.system_info['cpu']
@@ -439,42 +528,42 @@ class SystemInfoCollector:
         storage = self.system_info['storage']
         
         # Escape special LaTeX characters and format for academic standards
-        cpu_brand = cpu['brand'].replace('&', '\\&').replace('_', '\\_')
-        latex_code += f"Processor & {cpu_brand} \\\\\n"
-        latex_code += f"Architecture & {cpu['architecture']} \\\\\n"
-        latex_code += f"Physical/Logical Cores & {cpu['cores_physical']}/{cpu['cores_logical']} \\\\\n"
+        cpu_brand = cpu['brand'].translate(_LATEX_ESCAPE)
+        parts.append(f"Processor & {cpu_brand} \\\\\n")
+        parts.append(f"Architecture & {cpu['architecture'].translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append(f"Physical/Logical Cores & {cpu['cores_physical']}/{cpu['cores_logical']} \\\\\n")
         if cpu['frequency_ghz'] != "Unknown":
-            latex_code += f"CPU Frequency & {cpu['frequency_ghz']} GHz \\\\\n"
+            parts.append(f"CPU Frequency & {cpu['frequency_ghz']} GHz \\\\\n")
         
-        gpu_info = self.system_info['gpu'].replace('&', '\\&').replace('_', '\\_')
-        latex_code += f"Graphics Processing Unit & {gpu_info} \\\\\n"
-        latex_code += f"System Memory & {memory['total_gb']} GB {memory['type']} \\\\\n"
-        latex_code += f"Storage & {storage['total_gb']} GB {storage['type']} \\\\\n"
-        latex_code += "\\hline\n"
-        latex_code += "\\multicolumn{2}{|c|}{\\textbf{Software Environment}} \\\\\n"
-        latex_code += "\\hline\n"
+        gpu_info = self.system_info['gpu'].translate(_LATEX_ESCAPE)
+        parts.append(f"Graphics Processing Unit & {gpu_info} \\\\\n")
+        parts.append(f"System Memory & {memory['total_gb']} GB {memory['type'].translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append(f"Storage & {storage['total_gb']} GB {storage['type'].translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append("\\hline\n")
+        parts.append("\\multicolumn{2}{|c|}{\\textbf{Software Environment}} \\\\\n")
+        parts.append("\\hline\n")
         
         # Add software info
         os_info = self.system_info['os']
         packages = self.system_info['packages']
         
-        os_name = f"{os_info['name']} {os_info['release']}".replace('_', '\\_')
-        latex_code += f"Operating System & {os_name} \\\\\n"
-        latex_code += f"Python Runtime & {os_info['python_version']} \\\\\n"
-        latex_code += f"Charm-Crypto Library & {packages.get('charm-crypto', 'N/A')} \\\\\n"
-        latex_code += f"Cryptography Library & {packages.get('cryptography', 'N/A')} \\\\\n"
-        latex_code += f"Web3 Library & {packages.get('web3', 'N/A')} \\\\\n"
-        latex_code += "\\hline\n"
-        latex_code += "\\multicolumn{2}{|c|}{\\textbf{Blockchain \\& IPFS Tools}} \\\\\n"
-        latex_code += "\\hline\n"
+        os_name = f"{os_info['name']} {os_info['release']}".translate(_LATEX_ESCAPE)
+        parts.append(f"Operating System & {os_name} \\\\\n")
+        parts.append(f"Python Runtime & {os_info['python_version'].translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append(f"Charm-Crypto Library & {packages.get('charm-crypto', 'N/A').translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append(f"Cryptography Library & {packages.get('cryptography', 'N/A').translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append(f"Web3 Library & {packages.get('web3', 'N/A').translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append("\\hline\n")
+        parts.append("\\multicolumn{2}{|c|}{\\textbf{Blockchain \\& IPFS Tools}} \\\\\n")
+        parts.append("\\hline\n")
         
         # Add blockchain tools
         blockchain_tools = self.system_info['blockchain_tools']
-        latex_code += f"IPFS & {blockchain_tools.get('IPFS', 'N/A')} \\\\\n"
-        latex_code += f"Ganache CLI & {blockchain_tools.get('Ganache CLI', 'N/A')} \\\\\n"
-        latex_code += f"Truffle Framework & {blockchain_tools.get('Truffle', 'N/A')} \\\\\n"
+        parts.append(f"IPFS & {blockchain_tools.get('IPFS', 'N/A').translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append(f"Ganache CLI & {blockchain_tools.get('Ganache CLI', 'N/A').translate(_LATEX_ESCAPE)} \\\\\n")
+        parts.append(f"Truffle Framework & {blockchain_tools.get('Truffle', 'N/A').translate(_LATEX_ESCAPE)} \\\\\n")
         
-        latex_code += """\\hline
+        parts.append("""\\hline
 \\end{tabular}
 \\end{table}
 
@@ -482,12 +571,14 @@ class SystemInfoCollector:
 % This table provides comprehensive hardware and software configuration details
 % as requested by Reviewer 1 for inclusion in Section 6.1 (page 25).
 % The configuration ensures reproducibility of ABE performance experiments.
-"""
+""")
+        latex_code = "".join(parts)
         
-        print(latex_code)
+        header = "\n" + "="*80 + "\nLATEX TABLE FORMAT (for Section 6.1 - Academic Paper)\n" + "="*80
+        sys.stdout.write(header + "\n" + latex_code + "\n")
         
         # Save to file
-        latex_file = "/Users/thanhtuan/son/ABE/samples/system_config_table.tex"
+        latex_file = os.path.join(self.output_dir, "system_config_table.tex")
         try:
             with open(latex_file, 'w', encoding='utf-8') as f:
                 f.write(latex_code)
@@ -496,14 +587,18 @@ class SystemInfoCollector:
             print(f"Error saving LaTeX file: {str(e)}")
 
 
-def main():
+def main(csv_only=False, output_dir=None):
     """Main function to run system information collection"""
     print("System Information Collection for ABE Performance Study")
     print("=" * 60)
     print("Comprehensive hardware/software configuration for Reviewer 1 requirements")
     print("=" * 60)
     
-    collector = SystemInfoCollector()
+    collector = SystemInfoCollector(output_dir)
+    
+    if csv_only:
+        collector.export_to_csv()
+        return
     
     # Generate and display academic table
     collector.generate_academic_table()
@@ -527,4 +622,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Collect hardware/software configuration for the ABE performance study")
+    parser.add_argument('--csv-only', action='store_true',
+                        help="only export the CSV file, skip the console and LaTeX tables")
+    parser.add_argument('--output-dir',
+                        help="directory for the CSV and LaTeX files (default: next to this script)")
+    args = parser.parse_args()
+    main(csv_only=args.csv_only, output_dir=args.output_dir)